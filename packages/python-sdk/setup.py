@@ -0,0 +1,20 @@
+"""
+Optional mypyc build of the AxonPuls client hot path
+
+Project metadata lives in pyproject.toml. Set AXONPULS_USE_MYPYC=1 (with mypy
+installed in the build environment) to compile apix_client._fastpath:
+
+    pip install mypy
+    AXONPULS_USE_MYPYC=1 pip install --no-build-isolation .
+"""
+import os
+
+from setuptools import setup
+
+ext_modules = []
+if os.getenv("AXONPULS_USE_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify(["--follow-imports=silent", "src/apix_client/_fastpath.py"])
+
+setup(ext_modules=ext_modules)
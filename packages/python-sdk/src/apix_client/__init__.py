@@ -2,7 +2,7 @@
 AxonPuls Python Client - Multi-tenant real-time platform client
 """
 
-from .client import AxonPulsClient, create_org_client
+from .client import AxonPulsClient, close_shared_sessions, create_org_client
 from .types import (
     AxonPulsEvent,
     AxonPulsClientConfig,
@@ -26,6 +26,7 @@ __email__ = "support@AxonPuls.dev"
 __all__ = [
     "AxonPulsClient",
     "create_org_client",
+    "close_shared_sessions",
     "AxonPulsEvent",
     "AxonPulsClientConfig",
     "SubscribeOptions",
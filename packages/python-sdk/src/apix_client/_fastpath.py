@@ -0,0 +1,65 @@
+"""
+Per-message hot path helpers for the AxonPuls Python client
+
+Kept free of client state and fully typed so the module can be compiled
+with mypyc (see setup.py); the pure-Python module is used otherwise.
+"""
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def is_org_channel(channel: str, prefix: str) -> bool:
+    """Check that channel carries the organization prefix"""
+    return channel.startswith(prefix)
+
+
+def format_id(prefix: str, counter: int) -> str:
+    """Format a message ID from the client prefix and counter value"""
+    return f"{prefix}-{counter:x}"
+
+
+def build_envelope(head: bytes, payload: bytes, message_id: str, timestamp: int) -> bytes:
+    """Complete a pre-serialized message head with its payload, id and timestamp as an NDJSON line"""
+    return b"".join((
+        head,
+        payload,
+        b',"id":"',
+        message_id.encode(),
+        b'","timestamp":',
+        str(timestamp).encode(),
+        b"}\n",
+    ))
+
+
+def min_json_size(obj: object) -> int:
+    """Cheap lower bound on the encoded JSON size of obj, without encoding it"""
+    if isinstance(obj, str):
+        return len(obj) + 2  # quotes, at least one byte per character
+    if isinstance(obj, list):
+        return 2 * len(obj) + 1  # brackets, one byte per item and separator
+    if isinstance(obj, dict):
+        return 5 * len(obj) + 1  # braces, '"k":v' per item and separator
+    return 0
+
+
+def split_frame(frame: bytes) -> List[bytes]:
+    """Split a frame into its non-empty NDJSON lines"""
+    return [line for line in frame.split(b"\n") if line.strip()]
+
+
+async def dispatch(
+    handlers: Sequence[Tuple[Callable[[Dict[str, Any]], Any], bool]],
+    payload: Dict[str, Any],
+) -> None:
+    """Call each (handler, is_coroutine) pair with payload, logging handler errors"""
+    for handler, is_coro in handlers:
+        try:
+            if is_coro:
+                result: Awaitable[Any] = handler(payload)
+                await result
+            else:
+                handler(payload)
+        except Exception as e:
+            logger.error(f"Error in event handler: {e}")
@@ -2,19 +2,41 @@
 AxonPuls Python Client with Multi-Tenancy Support and Advanced Features
 Enhanced version with circuit breaker, exponential backoff, and comprehensive error handling
 """
+import array
 import asyncio
+import atexit
+import base64
+import itertools
 import json
-import jwt
+import os
+import random
+import time
+import uuid
+from collections import deque
 import websockets
+import websockets.asyncio.client
 import logging
-from typing import Dict, List, Optional, Callable, Any, Union
-from datetime import datetime, timedelta
+from typing import Awaitable, Deque, Dict, List, Optional, Callable, Any, Set, Tuple, Union, cast
 from enum import Enum
+from urllib.parse import urlsplit
 import aiohttp
 from dataclasses import dataclass, field
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:  # pragma: no cover - optional speedup
+    HAS_ORJSON = False
+
+from ._fastpath import (
+    build_envelope,
+    dispatch,
+    format_id,
+    is_org_channel,
+    min_json_size,
+    split_frame,
+)
 from .types import (
-    AxonPulsEvent,
     AxonPulsClientConfig,
     SubscribeOptions,
     PublishOptions,
@@ -32,6 +54,88 @@ from .errors import (
 logger = logging.getLogger(__name__)
 
 
+# JSON codec for the hot path: orjson encodes straight to UTF-8 bytes in C,
+# the stdlib fallback produces the same compact bytes
+_loads: Callable[[Union[bytes, str]], Any]
+if HAS_ORJSON:
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    _loads = orjson.loads
+else:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    _loads = json.loads
+
+
+# Static envelope fragments, serialized once; only dynamic fields are encoded per message
+_SUBSCRIBE_HEAD = b'{"type":"subscribe","payload":'
+_UNSUBSCRIBE_HEAD = b'{"type":"unsubscribe","payload":'
+_PUBLISH_HEAD = b'{"type":"publish","payload":'
+_REPLAY_HEAD = b'{"type":"replay","payload":'
+_PING_HEAD = b'{"type":"ping","payload":'
+_EMPTY_OBJECT = b"{}"
+
+# Largest value an array("Q") slot holds, bounding each stream entry ID part
+_STREAM_ID_PART_MAX = 2 ** 64 - 1
+
+
+# HTTP sessions shared by clients on the same event loop and gateway host,
+# reference-counted so the last client to disconnect closes the session
+_shared_sessions: Dict[Tuple[asyncio.AbstractEventLoop, str], Tuple[aiohttp.ClientSession, int]] = {}
+
+
+def _acquire_shared_session(host: str) -> aiohttp.ClientSession:
+    """Fetch or create the shared HTTP session for host on the running loop"""
+    key = (asyncio.get_running_loop(), host)
+    entry = _shared_sessions.get(key)
+    if entry is None or entry[0].closed:
+        # No cookie jar: cookies set for one organization must never reach another
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=500, ttl_dns_cache=20),
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+        refs = 0
+    else:
+        session, refs = entry
+    _shared_sessions[key] = (session, refs + 1)
+    return session
+
+
+async def _release_shared_session(host: str, session: aiohttp.ClientSession) -> None:
+    """Drop one reference to the shared HTTP session, closing it with the last one"""
+    key = (asyncio.get_running_loop(), host)
+    entry = _shared_sessions.get(key)
+    if entry is None or entry[0] is not session:
+        # Already closed through close_shared_sessions()
+        return
+    
+    refs = entry[1] - 1
+    if refs > 0:
+        _shared_sessions[key] = (session, refs)
+    else:
+        del _shared_sessions[key]
+        await session.close()
+
+
+async def close_shared_sessions() -> None:
+    """Close the shared HTTP sessions created on the running loop"""
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _shared_sessions if key[0] is loop]:
+        session, _ = _shared_sessions.pop(key)
+        await session.close()
+
+
+@atexit.register
+def _close_shared_sessions_at_exit() -> None:
+    """Best-effort close of shared HTTP sessions whose loop is still usable"""
+    for (loop, _), (session, _) in list(_shared_sessions.items()):
+        if not session.closed and not loop.is_closed() and not loop.is_running():
+            loop.run_until_complete(session.close())
+    _shared_sessions.clear()
+
+
 class CircuitState(Enum):
     CLOSED = "closed"
     OPEN = "open"
@@ -44,35 +148,119 @@ class CircuitBreaker:
     timeout_seconds: int = 60
     failure_count: int = 0
     state: CircuitState = CircuitState.CLOSED
-    last_failure_time: Optional[datetime] = None
+    last_failure_time: Optional[float] = None  # time.monotonic()
+    
+    # AIMD concurrency control: halve on send failure or high latency, grow by one otherwise
+    min_concurrency: int = 1
+    max_concurrency: int = 256
+    concurrency: int = 256
+    latency_target_seconds: float = 0.05
+    update_interval_seconds: float = 1.0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=128))
+    last_update_time: float = field(default_factory=time.monotonic)
 
-    def record_success(self):
+    def record_success(self) -> None:
         """Record a successful operation"""
         self.failure_count = 0
         if self.state == CircuitState.HALF_OPEN:
             self.state = CircuitState.CLOSED
 
-    def record_failure(self):
+    def record_failure(self) -> None:
         """Record a failed operation"""
         self.failure_count += 1
-        self.last_failure_time = datetime.now()
+        self.last_failure_time = time.monotonic()
         
         if self.failure_count >= self.failure_threshold:
             self.state = CircuitState.OPEN
 
+    def record_send_failure(self) -> None:
+        """Record a failed send and multiplicatively decrease concurrency"""
+        self.record_failure()
+        self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+
     def can_attempt(self) -> bool:
         """Check if an operation can be attempted"""
         if self.state == CircuitState.CLOSED:
             return True
         elif self.state == CircuitState.OPEN:
-            if (self.last_failure_time and 
-                datetime.now() - self.last_failure_time > timedelta(seconds=self.timeout_seconds)):
+            if (self.last_failure_time is not None and 
+                time.monotonic() - self.last_failure_time > self.timeout_seconds):
                 self.state = CircuitState.HALF_OPEN
                 return True
             return False
         else:  # HALF_OPEN
             return True
 
+    def record_latency(self, latency: float) -> None:
+        """Record an operation latency and adapt concurrency once per update interval"""
+        self.latencies.append(latency)
+        now = time.monotonic()
+        if now - self.last_update_time < self.update_interval_seconds:
+            return
+        
+        self.last_update_time = now
+        mean_latency = sum(self.latencies) / len(self.latencies)
+        self.latencies.clear()
+        if mean_latency > self.latency_target_seconds:
+            self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+        else:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+
+class _ChannelBatcher:
+    """Coalesce channels from calls made within a short window into one message"""
+
+    def __init__(
+        self,
+        send: Callable[[List[str]], Awaitable[None]],
+        window_seconds: float,
+        max_channels: int,
+    ):
+        self._send = send
+        self.window_seconds = window_seconds
+        self.max_channels = max_channels
+        self.pending: Dict[str, None] = {}  # insertion-ordered set
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: Set["asyncio.Task[None]"] = set()
+
+    def add(self, channels: List[str]) -> None:
+        """Queue channels for the next batch without waiting for it to be sent"""
+        self.pending.update(dict.fromkeys(channels))
+        if len(self.pending) >= self.max_channels:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window_seconds, self.flush)
+
+    def discard(self, channels: List[str]) -> None:
+        """Drop channels that have not been sent yet"""
+        for channel in channels:
+            self.pending.pop(channel, None)
+
+    def cancel(self) -> None:
+        """Drop the pending batch and its timer"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self.pending = {}
+
+    def flush(self) -> None:
+        """Hand the pending batch to a send task"""
+        channels = list(self.pending)
+        self.cancel()
+        if not channels:
+            return
+        
+        task = asyncio.ensure_future(self._send_batch(channels))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _send_batch(self, channels: List[str]) -> None:
+        """Send one batch; failures are logged since callers have already returned"""
+        try:
+            await self._send(channels)
+        except Exception as e:
+            logger.error(f"Failed to send batch of {len(channels)} channel(s): {e}")
+
 
 class AxonPulsClient:
     """Advanced AxonPuls client with multi-tenancy, circuit breaker, and comprehensive error handling"""
@@ -84,66 +272,112 @@ class AxonPulsClient:
     BACKOFF_BASE_MS = int(os.getenv('AXON_BACKOFF_BASE_MS', '250'))
     BACKOFF_FACTOR = float(os.getenv('AXON_BACKOFF_FACTOR', '2'))
     BACKOFF_MAX_MS = int(os.getenv('AXON_BACKOFF_MAX_MS', '30000'))
-    BACKOFF_JITTER = float(os.getenv('AXON_BACKOFF_JITTER', '0.2'))
+    SEND_BATCH_MAX_BYTES = int(os.getenv('AXON_SEND_BATCH_MAX_BYTES', '65536'))  # 64KB default
+    SUBSCRIBE_BATCH_WINDOW_MS = float(os.getenv('AXON_SUBSCRIBE_BATCH_WINDOW_MS', '1'))
+    SUBSCRIBE_BATCH_MAX_CHANNELS = int(os.getenv('AXON_SUBSCRIBE_BATCH_MAX_CHANNELS', '64'))
     
     def __init__(self, config: AxonPulsClientConfig):
         self.config = config
         self.org_id = self._extract_org_id_from_token(config.token)
         if not self.org_id:
             raise AxonPulsValidationError("Token must contain organizationId claim for multi-tenancy")
+        self._channel_prefix = f"org:{self.org_id}:"
+        
+        # Message IDs: one random per-client prefix plus a monotonic counter
+        self._id_prefix = uuid.uuid4().hex[:16]
+        self._id_counter = itertools.count()
         
         # Connection state
-        self.websocket: Optional[websockets.WebSocketServerProtocol] = None
-        self.subscriptions: set[str] = set()
-        self.event_handlers: Dict[str, List[EventHandler]] = {}
+        self.websocket: Optional[websockets.asyncio.client.ClientConnection] = None
+        # Subscriptions: channel -> slot id, plus a bitset of the slots in use
+        self._channel_slots: Dict[str, int] = {}
+        self._slot_bits = bytearray((self.MAX_CHANNELS + 7) // 8)
+        # Subscribe/unsubscribe calls made within a short window share one message
+        self._subscribe_batcher = _ChannelBatcher(
+            self._send_subscribe, self.SUBSCRIBE_BATCH_WINDOW_MS / 1000, self.SUBSCRIBE_BATCH_MAX_CHANNELS
+        )
+        self._unsubscribe_batcher = _ChannelBatcher(
+            self._send_unsubscribe, self.SUBSCRIBE_BATCH_WINDOW_MS / 1000, self.SUBSCRIBE_BATCH_MAX_CHANNELS
+        )
+        # Handlers are stored with their coroutine flag, computed once at registration
+        self.event_handlers: Dict[str, List[Tuple[EventHandler, bool]]] = {}
         self.connection_state = ConnectionState.DISCONNECTED
-        self._heartbeat_task: Optional[asyncio.Task] = None
-        self._reconnect_task: Optional[asyncio.Task] = None
+        self._run_task: Optional["asyncio.Task[None]"] = None
+        self._reconnect_task: Optional["asyncio.Task[None]"] = None
+        self._send_queue: Optional["asyncio.Queue[bytes]"] = None
+        self._send_slots: Optional[asyncio.Condition] = None
+        self._in_flight = 0
         
         # Advanced features
         self.circuit_breaker = CircuitBreaker()
         self.reconnect_attempt = 0
-        self.last_pong_time = datetime.now()
+        self._backoff_rng = random.SystemRandom()
+        self.last_pong_time = time.monotonic()
         self.missed_pongs = 0
-        self.last_stream_ids: Dict[str, str] = {}
+        # Last stream entry per subscription slot, as the two parts of a "<millis>-<seq>" ID
+        self._stream_millis = array.array("Q", bytes(8 * self.MAX_CHANNELS))
+        self._stream_seqs = array.array("Q", bytes(8 * self.MAX_CHANNELS))
+        
+        # Incoming message type -> handler
+        self._dispatch: Dict[str, Callable[[Dict[str, Any]], Awaitable[None]]] = {
+            "event": self._on_event,
+            "ack": self._on_ack,
+            "error": self._on_error,
+            "pong": self._on_pong,
+        }
         
-        # HTTP client for REST API calls
+        # HTTP client for REST API calls; the session is shared, so auth is sent per request
         self.http_session: Optional[aiohttp.ClientSession] = None
+        self._http_host = urlsplit(config.url).netloc
+        
+        # Handshake headers never change after init, so build them once for all connect attempts
+        self._auth_headers = {"Authorization": f"Bearer {config.token}"}
+        self._ws_headers = list(self._auth_headers.items())
+        self._user_agent = f"AxonPuls-python/{config.client_type or 'default'}"
         
         logger.info(f"AxonPuls client initialized for organization: {self.org_id}")
     
     def _extract_org_id_from_token(self, token: str) -> Optional[str]:
         """Extract organization ID from JWT token"""
         try:
-            # Decode without verification for org_id extraction
-            payload = jwt.decode(token, options={"verify_signature": False})
-            return payload.get("organizationId")
+            # Read the claims segment without verification for org_id extraction
+            _, payload_b64, _ = token.split(".")
+            padded = payload_b64 + "=" * (-len(payload_b64) % 4)
+            org_id = _loads(base64.urlsafe_b64decode(padded)).get("organizationId")
+            return org_id if isinstance(org_id, str) else None
         except Exception as e:
             logger.error(f"Failed to extract organizationId from token: {e}")
             return None
     
     def _validate_channel(self, channel: str) -> bool:
         """Validate that channel belongs to this organization"""
-        expected_prefix = f"org:{self.org_id}:"
-        if not channel.startswith(expected_prefix):
+        if not is_org_channel(channel, self._channel_prefix):
             raise AxonPulsTenantIsolationError(
                 f"Channel '{channel}' not in your organization. "
-                f"Use format: {expected_prefix}<channel_name>"
+                f"Use format: {self._channel_prefix}<channel_name>"
             )
         return True
     
-    def _validate_payload_size(self, payload: Any) -> bool:
-        """Validate payload size doesn't exceed limits"""
+    def _encode_payload(self, payload: Any) -> bytes:
+        """Serialize payload once and validate its size doesn't exceed limits"""
+        # Reject payloads that are certainly too large before paying for the encode
+        min_size = min_json_size(payload)
+        if min_size > self.MAX_PAYLOAD_BYTES:
+            raise AxonPulsValidationError(
+                f"Payload size (at least {min_size} bytes) exceeds maximum ({self.MAX_PAYLOAD_BYTES} bytes)"
+            )
+        
         try:
-            payload_json = json.dumps(payload)
-            size = len(payload_json.encode('utf-8'))
-            if size > self.MAX_PAYLOAD_BYTES:
-                raise AxonPulsValidationError(
-                    f"Payload size ({size} bytes) exceeds maximum ({self.MAX_PAYLOAD_BYTES} bytes)"
-                )
-            return True
+            payload_bytes = _dumps(payload)
         except (TypeError, ValueError) as e:
             raise AxonPulsValidationError(f"Invalid payload: {e}")
+        
+        size = len(payload_bytes)
+        if size > self.MAX_PAYLOAD_BYTES:
+            raise AxonPulsValidationError(
+                f"Payload size ({size} bytes) exceeds maximum ({self.MAX_PAYLOAD_BYTES} bytes)"
+            )
+        return payload_bytes
     
     async def connect(self) -> None:
         """Connect to AxonPuls gateway with circuit breaker protection"""
@@ -157,21 +391,15 @@ class AxonPulsClient:
         self.connection_state = ConnectionState.CONNECTING
         
         try:
-            # Initialize HTTP session if not exists
-            if not self.http_session:
-                self.http_session = aiohttp.ClientSession(
-                    headers={"Authorization": f"Bearer {self.config.token}"}
-                )
+            # Attach to the shared HTTP session for this gateway host
+            if not self.http_session or self.http_session.closed:
+                self.http_session = _acquire_shared_session(self._http_host)
             
             # Connect WebSocket
-            headers = {
-                "Authorization": f"Bearer {self.config.token}",
-                "User-Agent": f"AxonPuls-python/{self.config.client_type or 'default'}"
-            }
-            
-            self.websocket = await websockets.connect(
+            self.websocket = await websockets.asyncio.client.connect(
                 self.config.url,
-                extra_headers=headers,
+                additional_headers=self._ws_headers,
+                user_agent_header=self._user_agent,
                 ping_interval=self.config.heartbeat_interval or self.HEARTBEAT_INTERVAL,
                 ping_timeout=10,
                 max_size=self.MAX_PAYLOAD_BYTES,
@@ -183,11 +411,12 @@ class AxonPulsClient:
             
             logger.info(f"Connected to AxonPuls for org {self.org_id}")
             
-            # Start message handler and heartbeat
-            asyncio.create_task(self._message_handler())
-            
-            if self.config.heartbeat_interval and self.config.heartbeat_interval > 0:
-                self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+            # Start message handler, writer and heartbeat under one supervisor
+            self._send_queue = asyncio.Queue()
+            self._send_slots = asyncio.Condition()
+            self._in_flight = 0
+            self.last_pong_time = time.monotonic()
+            self._run_task = asyncio.create_task(self._run())
             
         except Exception as e:
             self.connection_state = ConnectionState.DISCONNECTED
@@ -200,12 +429,17 @@ class AxonPulsClient:
         self.connection_state = ConnectionState.DISCONNECTED
         
         # Cancel background tasks
-        if self._heartbeat_task:
-            self._heartbeat_task.cancel()
+        if self._run_task:
+            self._run_task.cancel()
             try:
-                await self._heartbeat_task
+                await self._run_task
             except asyncio.CancelledError:
                 pass
+            self._run_task = None
+        self._send_queue = None
+        self._subscribe_batcher.cancel()
+        self._unsubscribe_batcher.cancel()
+        await self._wake_senders()
         
         if self._reconnect_task:
             self._reconnect_task.cancel()
@@ -219,11 +453,11 @@ class AxonPulsClient:
             await self.websocket.close()
             self.websocket = None
         
-        # Close HTTP session
+        # Release shared HTTP session; the last client on this loop and host closes it
         if self.http_session:
-            await self.http_session.close()
+            await _release_shared_session(self._http_host, self.http_session)
             self.http_session = None
-            
+        
         logger.info(f"Disconnected from AxonPuls for org {self.org_id}")
     
     async def subscribe(self, channels: List[str], options: Optional[SubscribeOptions] = None) -> None:
@@ -232,26 +466,42 @@ class AxonPulsClient:
             raise AxonPulsConnectionError("Not connected to AxonPuls gateway")
         
         # Validate channel limits
-        if len(channels) + len(self.subscriptions) > self.MAX_CHANNELS:
+        new_channels = [c for c in dict.fromkeys(channels) if c not in self._channel_slots]
+        if len(new_channels) + len(self._channel_slots) > self.MAX_CHANNELS:
             raise AxonPulsValidationError(f"Maximum channel subscriptions ({self.MAX_CHANNELS}) exceeded")
         
         # Validate all channels belong to this org
         for channel in channels:
             self._validate_channel(channel)
         
-        message = {
-            "id": self._generate_id(),
-            "type": "subscribe",
-            "payload": {
-                "channels": channels,
-                "options": options.__dict__ if options else {}
-            },
-            "timestamp": int(datetime.now().timestamp() * 1000)
-        }
+        # Claim slots before any await so concurrent calls see each other's channels
+        for channel in new_channels:
+            self._assign_slot(channel)
         
-        await self._send_message(message)
-        self.subscriptions.update(channels)
+        # Options apply per message, so only option-less calls are coalesced. Batched
+        # channels count as subscribed right away; if the send fails they are re-sent
+        # with the other subscriptions on reconnect. Either way, a pending unsubscribe
+        # of the same channels is dropped so the last call wins.
+        self._unsubscribe_batcher.discard(channels)
+        if options:
+            try:
+                await self._send_subscribe(channels, options)
+            except Exception:
+                for channel in new_channels:
+                    self._release_slot(channel)
+                raise
+        else:
+            self._subscribe_batcher.add(channels)
+    
+    async def _send_subscribe(self, channels: List[str], options: Optional[SubscribeOptions] = None) -> None:
+        """Send one subscribe message"""
+        message = self._envelope(
+            _SUBSCRIBE_HEAD,
+            b'{"channels":' + _dumps(channels)
+            + b',"options":' + (_dumps(options.to_dict()) if options else _EMPTY_OBJECT) + b"}",
+        )
         
+        await self._send_message(message)
         logger.info(f"Subscribed to channels: {channels}")
     
     async def unsubscribe(self, channels: List[str]) -> None:
@@ -262,16 +512,16 @@ class AxonPulsClient:
         for channel in channels:
             self._validate_channel(channel)
         
-        message = {
-            "id": self._generate_id(),
-            "type": "unsubscribe",
-            "payload": {"channels": channels},
-            "timestamp": int(datetime.now().timestamp() * 1000)
-        }
+        self._subscribe_batcher.discard(channels)
+        self._unsubscribe_batcher.add(channels)
+        for channel in channels:
+            self._release_slot(channel)
+    
+    async def _send_unsubscribe(self, channels: List[str]) -> None:
+        """Send one unsubscribe message"""
+        message = self._envelope(_UNSUBSCRIBE_HEAD, b'{"channels":' + _dumps(channels) + b"}")
         
         await self._send_message(message)
-        self.subscriptions.difference_update(channels)
-        
         logger.info(f"Unsubscribed from channels: {channels}")
     
     async def publish(
@@ -287,31 +537,34 @@ class AxonPulsClient:
             raise AxonPulsConnectionError("Not connected to AxonPuls gateway")
         
         self._validate_channel(channel)
-        self._validate_payload_size(payload)
-        
-        event = AxonPulsEvent(
-            id=self._generate_id(),
-            type=event_type,
-            payload=payload,
-            timestamp=int(datetime.now().timestamp() * 1000),
-            metadata={
+        payload_bytes = self._encode_payload(payload)
+        
+        # Wire form of AxonPulsEvent, with the already-encoded payload spliced in
+        event = b"".join((
+            b'{"id":"',
+            self._generate_id().encode(),
+            b'","type":',
+            _dumps(event_type),
+            b',"payload":',
+            payload_bytes,
+            b',"timestamp":',
+            str(time.time_ns() // 1_000_000).encode(),
+            b',"metadata":',
+            _dumps({
                 "correlation_id": correlation_id or self._generate_id(),
                 "org_id": self.org_id,
                 "channel": channel,
-            }
+            }),
+            b"}",
+        ))
+        
+        message = self._envelope(
+            _PUBLISH_HEAD,
+            b'{"channel":' + _dumps(channel)
+            + b',"event":' + event
+            + b',"options":' + (_dumps(options.to_dict()) if options else _EMPTY_OBJECT) + b"}",
         )
         
-        message = {
-            "id": self._generate_id(),
-            "type": "publish",
-            "payload": {
-                "channel": channel,
-                "event": event.__dict__,
-                "options": options.__dict__ if options else {}
-            },
-            "timestamp": int(datetime.now().timestamp() * 1000)
-        }
-        
         await self._send_message(message)
         logger.debug(f"Published {event_type} to {channel}")
     
@@ -327,110 +580,225 @@ class AxonPulsClient:
         
         self._validate_channel(channel)
         
-        message = {
-            "id": self._generate_id(),
-            "type": "replay",
-            "payload": {
-                "channel": channel,
-                "sinceId": since_id,
-                "count": count
-            },
-            "timestamp": int(datetime.now().timestamp() * 1000)
-        }
+        message = self._envelope(
+            _REPLAY_HEAD,
+            b'{"channel":' + _dumps(channel)
+            + b',"sinceId":' + _dumps(since_id)
+            + b',"count":' + _dumps(count) + b"}",
+        )
         
         await self._send_message(message)
         logger.info(f"Requested replay for {channel}")
     
+    async def http_request(self, method: str, url: str, **kwargs: Any) -> aiohttp.ClientResponse:
+        """Make an authenticated REST API request through the shared HTTP session"""
+        if not self.http_session or self.http_session.closed:
+            raise AxonPulsConnectionError("Not connected to AxonPuls gateway")
+        
+        headers = {**self._auth_headers, **kwargs.pop("headers", {})}
+        return await self.http_session.request(method, url, headers=headers, **kwargs)
+    
     def on(self, event_type: str, handler: EventHandler) -> None:
         """Register event handler"""
         if event_type not in self.event_handlers:
             self.event_handlers[event_type] = []
-        self.event_handlers[event_type].append(handler)
+        self.event_handlers[event_type].append((handler, asyncio.iscoroutinefunction(handler)))
     
     def off(self, event_type: str, handler: Optional[EventHandler] = None) -> None:
         """Unregister event handler"""
         if event_type in self.event_handlers:
             if handler:
-                try:
-                    self.event_handlers[event_type].remove(handler)
-                except ValueError:
-                    pass
+                handlers = self.event_handlers[event_type]
+                for i, (registered, _) in enumerate(handlers):
+                    if registered == handler:
+                        del handlers[i]
+                        break
             else:
                 del self.event_handlers[event_type]
     
-    async def _send_message(self, message: Dict[str, Any]) -> None:
-        """Send message to gateway with error handling"""
+    def _envelope(self, head: bytes, payload: bytes) -> bytes:
+        """Complete a pre-serialized message head with its payload, id and timestamp"""
+        return build_envelope(head, payload, self._generate_id(), time.time_ns() // 1_000_000)
+    
+    async def _send_message(self, message: bytes) -> None:
+        """Queue serialized message for the writer task, subject to concurrency limits"""
         if not self.websocket or self.connection_state != ConnectionState.CONNECTED:
             raise AxonPulsConnectionError("Not connected to AxonPuls gateway")
         
+        send_slots = self._send_slots
+        assert send_slots is not None
+        
+        # Admission control: wait until fewer than circuit_breaker.concurrency messages are in flight
+        async with send_slots:
+            await send_slots.wait_for(self._can_admit)
+        send_queue = self._send_queue
+        if send_queue is None or self.connection_state != ConnectionState.CONNECTED:
+            raise AxonPulsConnectionError("Not connected to AxonPuls gateway")
+        
+        self._in_flight += 1
+        await send_queue.put(message)
+    
+    def _can_admit(self) -> bool:
+        """Check whether another message may be queued"""
+        return (self._in_flight < self.circuit_breaker.concurrency or
+                self.connection_state != ConnectionState.CONNECTED)
+    
+    async def _wake_senders(self) -> None:
+        """Wake senders waiting for admission so they re-check limits and connection state"""
+        send_slots = self._send_slots
+        if send_slots is not None:
+            async with send_slots:
+                send_slots.notify_all()
+    
+    async def _writer_loop(self) -> None:
+        """Drain the send queue, coalescing queued messages into a single frame per send"""
+        queue = self._send_queue
+        websocket = self.websocket
+        assert queue is not None and websocket is not None
+        while True:
+            message = await queue.get()
+            batch = [message]
+            batch_size = len(message)
+            while batch_size < self.SEND_BATCH_MAX_BYTES and not queue.empty():
+                message = queue.get_nowait()
+                batch.append(message)
+                batch_size += len(message)
+            
+            started = time.monotonic()
+            try:
+                # Gateway expects text frames; each message is already an NDJSON line
+                await websocket.send(b"".join(batch).decode("utf-8"))
+                self.circuit_breaker.record_latency(time.monotonic() - started)
+            except websockets.exceptions.ConnectionClosed as e:
+                logger.error(f"Failed to send {len(batch)} message(s): {e}")
+                self.circuit_breaker.record_send_failure()
+                return
+            except Exception as e:
+                logger.error(f"Failed to send {len(batch)} message(s): {e}")
+                self.circuit_breaker.record_send_failure()
+            finally:
+                self._in_flight -= len(batch)
+                await self._wake_senders()
+    
+    async def _run(self) -> None:
+        """Supervise per-connection tasks; when one exits, tear down the others"""
+        tasks = [
+            asyncio.create_task(self._message_handler()),
+            asyncio.create_task(self._writer_loop()),
+        ]
+        if self.config.heartbeat_interval and self.config.heartbeat_interval > 0:
+            tasks.append(asyncio.create_task(self._heartbeat_loop()))
+        
         try:
-            await self.websocket.send(json.dumps(message))
-        except Exception as e:
-            logger.error(f"Failed to send message: {e}")
-            self.circuit_breaker.record_failure()
-            raise AxonPulsConnectionError(f"Failed to send message: {e}")
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        for task in done:
+            if not task.cancelled() and task.exception():
+                logger.error(f"Connection task failed: {task.exception()}")
+        
+        # Connection lost rather than closed through disconnect()
+        if self.connection_state == ConnectionState.CONNECTED:
+            self.connection_state = ConnectionState.DISCONNECTED
+            # Unsent subscriptions are re-sent from the slot table on reconnect
+            self._subscribe_batcher.cancel()
+            self._unsubscribe_batcher.cancel()
+            await self._wake_senders()
+            if self.websocket:
+                await self.websocket.close()
+                self.websocket = None
+            
+            if self.config.auto_reconnect:
+                self._reconnect_task = asyncio.create_task(self._reconnect())
     
     async def _message_handler(self) -> None:
         """Handle incoming messages with comprehensive error handling"""
+        websocket = self.websocket
+        assert websocket is not None
         try:
-            async for message in self.websocket:
-                try:
-                    data = json.loads(message)
-                    await self._handle_message(data)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse message: {e}")
-                except Exception as e:
-                    logger.error(f"Error handling message: {e}")
+            while True:
+                # decode=False hands the raw frame bytes straight to the JSON parser
+                frame = cast(bytes, await websocket.recv(decode=False))
+                for data in self._parse_frame(frame):
+                    try:
+                        await self._handle_message(data)
+                    except Exception as e:
+                        logger.error(f"Error handling message: {e}")
         except websockets.exceptions.ConnectionClosed:
             logger.info("WebSocket connection closed")
-            self.connection_state = ConnectionState.DISCONNECTED
-            
-            if self.config.auto_reconnect:
-                self._reconnect_task = asyncio.create_task(self._reconnect())
         except Exception as e:
             logger.error(f"Message handler error: {e}")
-            if self.config.auto_reconnect:
-                self._reconnect_task = asyncio.create_task(self._reconnect())
     
-    async def _handle_message(self, data: Dict[str, Any]) -> None:
-        """Handle parsed message"""
-        message_type = data.get("type")
-        payload = data.get("payload", {})
-        
-        # Handle different message types
-        if message_type == "event":
-            event_type = payload.get("type")
-            
-            # Track stream IDs for replay
-            if (payload.get("metadata", {}).get("channel") and 
-                payload.get("metadata", {}).get("stream_entry_id")):
-                channel = payload["metadata"]["channel"]
-                stream_id = payload["metadata"]["stream_entry_id"]
-                self.last_stream_ids[channel] = stream_id
-            
-            # Emit to registered handlers
-            if event_type in self.event_handlers:
-                for handler in self.event_handlers[event_type]:
-                    try:
-                        if asyncio.iscoroutinefunction(handler):
-                            await handler(payload)
-                        else:
-                            handler(payload)
-                    except Exception as e:
-                        logger.error(f"Error in event handler: {e}")
-        
-        elif message_type == "ack":
-            logger.debug(f"Received acknowledgment: {data}")
+    def _parse_frame(self, frame: bytes) -> List[Any]:
+        """Parse a frame holding one JSON message or a batch of NDJSON lines"""
+        # Decode errors are ValueErrors for both codecs; the stdlib parser can also
+        # hit the recursion limit on deeply nested input
+        try:
+            return [_loads(frame)]
+        except (ValueError, RecursionError):
+            pass
         
-        elif message_type == "error":
-            error = payload.get("error", {})
-            logger.error(f"Received error: {error}")
-            # Could emit error events here
+        messages = []
+        for line in split_frame(frame):
+            try:
+                messages.append(_loads(line))
+            except (ValueError, RecursionError) as e:
+                logger.error(f"Failed to parse message: {e}")
+        return messages
+    
+    async def _handle_message(self, data: Dict[str, Any]) -> None:
+        """Handle parsed message by dispatching on its type"""
+        handler = self._dispatch.get(data.get("type", ""))
+        if handler is not None:
+            await handler(data.get("payload", {}))
+    
+    async def _on_event(self, payload: Dict[str, Any]) -> None:
+        """Handle event message"""
+        event_type = payload.get("type", "")
+        
+        # Track stream IDs for replay on subscribed channels; never blocks dispatch
+        metadata = payload.get("metadata")
+        if not isinstance(metadata, dict):
+            metadata = {}
+        channel = metadata.get("channel")
+        stream_id = metadata.get("stream_entry_id")
+        slot = self._channel_slots.get(channel) if isinstance(channel, str) else None
+        if slot is not None and isinstance(stream_id, str) and stream_id:
+            millis, _, seq = stream_id.partition("-")
+            try:
+                millis_value, seq_value = int(millis), int(seq or 0)
+            except ValueError:
+                millis_value = seq_value = -1
+            # Store both parts or neither, so a replay never resumes from a made-up ID
+            if 0 <= millis_value <= _STREAM_ID_PART_MAX and 0 <= seq_value <= _STREAM_ID_PART_MAX:
+                self._stream_millis[slot] = millis_value
+                self._stream_seqs[slot] = seq_value
+            else:
+                logger.debug(f"Ignoring malformed stream entry ID: {stream_id}")
         
-        elif message_type == "pong":
-            self.last_pong_time = datetime.now()
-            self.missed_pongs = 0
-            logger.debug("Received pong")
+        # Emit to registered handlers
+        handlers = self.event_handlers.get(event_type)
+        if handlers is not None:
+            await dispatch(handlers, payload)
+    
+    async def _on_ack(self, payload: Dict[str, Any]) -> None:
+        """Handle acknowledgment message"""
+        logger.debug(f"Received acknowledgment: {payload}")
+    
+    async def _on_error(self, payload: Dict[str, Any]) -> None:
+        """Handle error message"""
+        error = payload.get("error", {})
+        logger.error(f"Received error: {error}")
+        # Could emit error events here
+    
+    async def _on_pong(self, payload: Dict[str, Any]) -> None:
+        """Handle pong message"""
+        self.last_pong_time = time.monotonic()
+        self.missed_pongs = 0
+        logger.debug("Received pong")
     
     async def _heartbeat_loop(self) -> None:
         """Send periodic heartbeat with liveness checking"""
@@ -440,21 +808,12 @@ class AxonPulsClient:
                 
                 if self.connection_state == ConnectionState.CONNECTED:
                     # Check for missed pongs
-                    time_since_pong = datetime.now() - self.last_pong_time
-                    if time_since_pong.total_seconds() > (self.config.heartbeat_interval or self.HEARTBEAT_INTERVAL) * 2.5:
+                    time_since_pong = time.monotonic() - self.last_pong_time
+                    if time_since_pong > (self.config.heartbeat_interval or self.HEARTBEAT_INTERVAL) * 2.5:
                         logger.error("Heartbeat missed - connection may be dead")
-                        await self.disconnect()
-                        if self.config.auto_reconnect:
-                            self._reconnect_task = asyncio.create_task(self._reconnect())
                         return
                     
-                    ping_message = {
-                        "id": self._generate_id(),
-                        "type": "ping",
-                        "payload": {},
-                        "timestamp": int(datetime.now().timestamp() * 1000)
-                    }
-                    await self._send_message(ping_message)
+                    await self._send_message(self._envelope(_PING_HEAD, _EMPTY_OBJECT))
                     
             except Exception as e:
                 logger.error(f"Heartbeat error: {e}")
@@ -466,13 +825,9 @@ class AxonPulsClient:
         
         while self.reconnect_attempt < max_retries:
             try:
-                # Calculate delay with exponential backoff and jitter
+                # Calculate delay with exponential backoff and full jitter
                 base_delay = self.BACKOFF_BASE_MS * (self.BACKOFF_FACTOR ** self.reconnect_attempt)
-                delay = min(base_delay, self.BACKOFF_MAX_MS) / 1000  # Convert to seconds
-                
-                # Add jitter
-                jitter = 1 + (2 * self.BACKOFF_JITTER * (0.5 - asyncio.get_event_loop().time() % 1))
-                delay *= jitter
+                delay = self._backoff_rng.uniform(0, min(base_delay, self.BACKOFF_MAX_MS) / 1000)
                 
                 logger.info(f"Reconnection attempt {self.reconnect_attempt + 1}/{max_retries} in {delay:.2f}s")
                 await asyncio.sleep(delay)
@@ -481,8 +836,8 @@ class AxonPulsClient:
                 await self.connect()
                 
                 # Re-subscribe to channels
-                if self.subscriptions:
-                    await self.subscribe(list(self.subscriptions))
+                if self._channel_slots:
+                    await self.subscribe(list(self._channel_slots))
                 
                 logger.info("Reconnected successfully")
                 return
@@ -493,10 +848,33 @@ class AxonPulsClient:
         logger.error("Failed to reconnect after maximum retries")
         # Could emit a connection_failed event here
     
+    def _assign_slot(self, channel: str) -> int:
+        """Map channel to the lowest free subscription slot"""
+        for index, byte in enumerate(self._slot_bits):
+            if byte != 0xFF:
+                slot = index * 8 + ((~byte & (byte + 1)).bit_length() - 1)
+                if slot < self.MAX_CHANNELS:
+                    break
+        else:
+            # Slots past MAX_CHANNELS in the last byte are never handed out
+            raise AxonPulsValidationError(f"Maximum channel subscriptions ({self.MAX_CHANNELS}) exceeded")
+        
+        self._slot_bits[slot >> 3] |= 1 << (slot & 7)
+        self._channel_slots[channel] = slot
+        return slot
+    
+    def _release_slot(self, channel: str) -> Optional[int]:
+        """Free the subscription slot held by channel, if any"""
+        slot = self._channel_slots.pop(channel, None)
+        if slot is not None:
+            self._slot_bits[slot >> 3] &= ~(1 << (slot & 7))
+            self._stream_millis[slot] = 0
+            self._stream_seqs[slot] = 0
+        return slot
+    
     def _generate_id(self) -> str:
         """Generate unique message ID"""
-        import uuid
-        return str(uuid.uuid4())
+        return format_id(self._id_prefix, next(self._id_counter))
     
     @property
     def is_connected(self) -> bool:
@@ -508,10 +886,25 @@ class AxonPulsClient:
         """Get organization ID"""
         return self.org_id
     
+    @property
+    def subscriptions(self) -> Set[str]:
+        """Get set of subscribed channels"""
+        return set(self._channel_slots)
+    
     @property
     def active_subscriptions(self) -> List[str]:
         """Get list of active subscriptions"""
-        return list(self.subscriptions)
+        return list(self._channel_slots)
+    
+    @property
+    def last_stream_ids(self) -> Dict[str, str]:
+        """Get last seen stream entry ID per subscribed channel"""
+        stream_ids = {}
+        for channel, slot in self._channel_slots.items():
+            millis, seq = self._stream_millis[slot], self._stream_seqs[slot]
+            if millis or seq:
+                stream_ids[channel] = f"{millis}-{seq}"
+        return stream_ids
 
 
 # Convenience functions for multi-tenant usage
@@ -1,10 +1,14 @@
 """
 Type definitions for AxonPuls Python client
 """
+import sys
 from typing import Any, Callable, Dict, List, Optional, Union
 from dataclasses import dataclass
 from enum import Enum
 
+# dataclass(slots=True) is only available on Python 3.10+
+_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 class ConnectionState(Enum):
     """Connection state enumeration"""
@@ -14,7 +18,7 @@ class ConnectionState(Enum):
     RECONNECTING = "reconnecting"
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class AxonPulsClientConfig:
     """Configuration for AxonPuls client"""
     url: str
@@ -26,7 +30,7 @@ class AxonPulsClientConfig:
     debug: bool = False
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class AxonPulsEvent:
     """AxonPuls event structure"""
     id: str
@@ -34,21 +38,46 @@ class AxonPulsEvent:
     payload: Any
     timestamp: int
     metadata: Optional[Dict[str, Any]] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert event to dictionary"""
+        return {
+            "id": self.id,
+            "type": self.type,
+            "payload": self.payload,
+            "timestamp": self.timestamp,
+            "metadata": self.metadata,
+        }
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class SubscribeOptions:
     """Options for channel subscription"""
     replay_from: Optional[str] = None
     replay_count: Optional[int] = None
     filter: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert options to dictionary"""
+        return {
+            "replay_from": self.replay_from,
+            "replay_count": self.replay_count,
+            "filter": self.filter,
+        }
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class PublishOptions:
     """Options for event publishing"""
     delivery_guarantee: Optional[str] = None  # 'at_least_once' | 'at_most_once'
     partition_key: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert options to dictionary"""
+        return {
+            "delivery_guarantee": self.delivery_guarantee,
+            "partition_key": self.partition_key,
+        }
 
 
 # Type alias for event handlers
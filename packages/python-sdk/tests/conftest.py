@@ -0,0 +1,32 @@
+import base64
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from apix_client import AxonPulsClient, AxonPulsClientConfig  # noqa: E402
+
+
+def make_token(org_id: str) -> str:
+    """Build an unsigned JWT carrying the organizationId claim"""
+    def segment(data: Dict[str, Any]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+    return f'{segment({"alg": "none"})}.{segment({"organizationId": org_id})}.sig'
+
+
+@pytest.fixture
+def make_client() -> Callable[..., AxonPulsClient]:
+    def factory(url: str = "ws://127.0.0.1:1", **kwargs: Any) -> AxonPulsClient:
+        return AxonPulsClient(AxonPulsClientConfig(url=url, token=make_token("org1"), **kwargs))
+
+    return factory
+
+
+@pytest.fixture
+def client(make_client: Callable[..., AxonPulsClient]) -> AxonPulsClient:
+    return make_client()
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import logging
+
+import pytest
+import pytest_asyncio
+from websockets.asyncio.server import serve
+
+from apix_client import AxonPulsConnectionError, AxonPulsValidationError, SubscribeOptions
+from apix_client.client import _ChannelBatcher
+
+
+class Recorder:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    async def __call__(self, channels):
+        self.batches.append(channels)
+        if self.fail:
+            raise RuntimeError("boom")
+
+
+async def drain():
+    # Let scheduled flush tasks run
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_flushes_after_window():
+    send = Recorder()
+    batcher = _ChannelBatcher(send, window_seconds=0.01, max_channels=100)
+
+    batcher.add(["a", "b"])
+    batcher.add(["b", "c"])
+    await drain()
+    assert send.batches == []
+
+    await asyncio.sleep(0.03)
+    assert send.batches == [["a", "b", "c"]]
+
+
+@pytest.mark.asyncio
+async def test_flushes_immediately_at_max_channels():
+    send = Recorder()
+    batcher = _ChannelBatcher(send, window_seconds=60, max_channels=3)
+
+    batcher.add(["a", "b"])
+    batcher.add(["c", "d"])
+    await drain()
+
+    assert send.batches == [["a", "b", "c", "d"]]
+    assert batcher.pending == {}
+
+    # The window timer was cancelled along with the flushed batch
+    batcher.add(["e"])
+    await drain()
+    assert send.batches == [["a", "b", "c", "d"]]
+
+
+@pytest.mark.asyncio
+async def test_discard_and_cancel_drop_pending_channels():
+    send = Recorder()
+    batcher = _ChannelBatcher(send, window_seconds=0.01, max_channels=100)
+
+    batcher.add(["a", "b"])
+    batcher.discard(["a"])
+    await asyncio.sleep(0.03)
+    assert send.batches == [["b"]]
+
+    batcher.add(["c"])
+    batcher.cancel()
+    await asyncio.sleep(0.03)
+    assert send.batches == [["b"]]
+
+
+@pytest.mark.asyncio
+async def test_send_errors_are_logged_and_later_batches_still_sent(caplog):
+    send = Recorder(fail=True)
+    batcher = _ChannelBatcher(send, window_seconds=60, max_channels=1)
+
+    with caplog.at_level(logging.ERROR, logger="apix_client.client"):
+        batcher.add(["a"])
+        await drain()
+    assert "Failed to send batch of 1 channel(s): boom" in caplog.text
+
+    send.fail = False
+    batcher.add(["b"])
+    await drain()
+    assert send.batches == [["a"], ["b"]]
+
+
+@pytest.mark.asyncio
+async def test_subscribe_requires_connection(client):
+    with pytest.raises(AxonPulsConnectionError):
+        await client.subscribe(["org:org1:a"])
+    with pytest.raises(AxonPulsConnectionError):
+        await client.unsubscribe(["org:org1:a"])
+
+
+@pytest_asyncio.fixture
+async def gateway(make_client):
+    """Client connected to a local websocket server that records received messages"""
+    received = []
+
+    async def handler(websocket):
+        async for message in websocket:
+            received.extend(json.loads(line) for line in message.splitlines())
+
+    async with serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        client = make_client(url=f"ws://127.0.0.1:{port}", heartbeat_interval=0)
+        await client.connect()
+        try:
+            yield client, received
+        finally:
+            await client.disconnect()
+
+
+async def wait_for_batches(client):
+    await asyncio.sleep(client.SUBSCRIBE_BATCH_WINDOW_MS / 1000 + 0.1)
+
+
+@pytest.mark.asyncio
+async def test_sequential_subscribes_share_one_message(gateway):
+    client, received = gateway
+
+    for channel in ["org:org1:a", "org:org1:b", "org:org1:c"]:
+        await client.subscribe([channel])
+    assert client.subscriptions == {"org:org1:a", "org:org1:b", "org:org1:c"}
+    await wait_for_batches(client)
+
+    subscribes = [message for message in received if message["type"] == "subscribe"]
+    assert [message["payload"]["channels"] for message in subscribes] == [
+        ["org:org1:a", "org:org1:b", "org:org1:c"]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_subscribe_with_options_drops_pending_unsubscribe(gateway):
+    client, received = gateway
+
+    await client.subscribe(["org:org1:a"])
+    await client.unsubscribe(["org:org1:a"])
+    await client.subscribe(["org:org1:a"], SubscribeOptions(replay_count=10))
+    await wait_for_batches(client)
+
+    assert client.subscriptions == {"org:org1:a"}
+    assert [message["type"] for message in received] == ["subscribe"]
+    assert received[0]["payload"]["options"]["replay_count"] == 10
+
+
+@pytest.mark.asyncio
+async def test_concurrent_option_subscribes_respect_limit(gateway, monkeypatch):
+    client, received = gateway
+    monkeypatch.setattr(client, "MAX_CHANNELS", 1)
+    send_message = client._send_message
+
+    async def yielding_send_message(message):
+        # Let the other subscribe run while this one is mid-send
+        await asyncio.sleep(0)
+        await send_message(message)
+
+    monkeypatch.setattr(client, "_send_message", yielding_send_message)
+
+    results = await asyncio.gather(
+        client.subscribe(["org:org1:a"], SubscribeOptions(replay_count=10)),
+        client.subscribe(["org:org1:b"], SubscribeOptions(replay_count=10)),
+        return_exceptions=True,
+    )
+
+    assert results[0] is None
+    assert isinstance(results[1], AxonPulsValidationError)
+    assert client.subscriptions == {"org:org1:a"}
+    await wait_for_batches(client)
+    assert [message["payload"]["channels"] for message in received] == [["org:org1:a"]]
@@ -0,0 +1,62 @@
+from apix_client.client import CircuitBreaker, CircuitState
+
+
+def make_breaker(**kwargs):
+    # Adapt on every latency sample so tests do not depend on wall-clock time
+    return CircuitBreaker(update_interval_seconds=0.0, **kwargs)
+
+
+def test_high_latency_halves_concurrency():
+    breaker = make_breaker(concurrency=64)
+
+    breaker.record_latency(1.0)
+    assert breaker.concurrency == 32
+
+    breaker.record_latency(1.0)
+    assert breaker.concurrency == 16
+
+
+def test_low_latency_grows_concurrency_by_one_up_to_max():
+    breaker = make_breaker(concurrency=10, max_concurrency=12)
+
+    for _ in range(5):
+        breaker.record_latency(0.001)
+
+    assert breaker.concurrency == 12
+
+
+def test_concurrency_never_drops_below_min():
+    breaker = make_breaker(concurrency=4, min_concurrency=2)
+
+    for _ in range(5):
+        breaker.record_send_failure()
+
+    assert breaker.concurrency == 2
+
+
+def test_latency_is_averaged_per_update_interval():
+    breaker = CircuitBreaker(concurrency=64, update_interval_seconds=3600.0)
+
+    breaker.record_latency(1.0)
+    assert breaker.concurrency == 64
+    assert list(breaker.latencies) == [1.0]
+
+
+def test_connect_failures_do_not_shrink_concurrency():
+    breaker = make_breaker()
+
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.concurrency == breaker.max_concurrency
+
+
+def test_send_failure_counts_towards_circuit_state():
+    breaker = make_breaker(failure_threshold=2, concurrency=8)
+
+    breaker.record_send_failure()
+    breaker.record_send_failure()
+
+    assert breaker.concurrency == 2
+    assert breaker.state == CircuitState.OPEN
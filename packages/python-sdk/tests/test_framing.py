@@ -0,0 +1,79 @@
+import asyncio
+import json
+import logging
+
+import pytest
+from websockets.asyncio.server import serve
+
+from apix_client import client as client_module
+from apix_client._fastpath import split_frame
+
+DEEPLY_NESTED = b"[" * 100000 + b"]" * 100000
+
+
+@pytest.fixture(autouse=True, params=["orjson", "json"])
+def codec(request, monkeypatch):
+    """Run each test with the optional orjson codec and with the stdlib fallback"""
+    if request.param == "orjson":
+        orjson = pytest.importorskip("orjson")
+        monkeypatch.setattr(client_module, "_loads", orjson.loads)
+    else:
+        monkeypatch.setattr(client_module, "_loads", json.loads)
+    return request.param
+
+
+def test_single_object_frame(client):
+    assert client._parse_frame(b'{"type":"ack","payload":{"id":"1"}}') == [
+        {"type": "ack", "payload": {"id": "1"}}
+    ]
+
+
+def test_ndjson_frame(client):
+    frame = b'{"type":"ack"}\n{"type":"pong"}\n\n{"type":"event"}\n'
+
+    assert client._parse_frame(frame) == [{"type": "ack"}, {"type": "pong"}, {"type": "event"}]
+
+
+def test_pretty_printed_frame(client):
+    message = {"type": "event", "payload": {"type": "update", "metadata": {"channel": "org:org1:a"}}}
+
+    assert client._parse_frame(json.dumps(message, indent=2).encode()) == [message]
+
+
+def test_malformed_lines_are_skipped(client, caplog):
+    with caplog.at_level(logging.ERROR, logger="apix_client.client"):
+        messages = client._parse_frame(b'{"type":"ack"}\nnot json\n{"type":"pong"}')
+
+    assert messages == [{"type": "ack"}, {"type": "pong"}]
+    assert "Failed to parse message" in caplog.text
+
+
+@pytest.mark.parametrize("frame", [b"", b"\n", b"{", DEEPLY_NESTED], ids=["empty", "blank", "truncated", "deeply-nested"])
+def test_unparseable_frame_yields_nothing(client, codec, frame):
+    if codec == "orjson" and frame is DEEPLY_NESTED:
+        pytest.skip("orjson parses nesting this deep")
+    assert client._parse_frame(frame) == []
+
+
+def test_split_frame_drops_blank_lines():
+    assert split_frame(b'{"a":1}\n \n{"b":2}\n') == [b'{"a":1}', b'{"b":2}']
+
+
+@pytest.mark.asyncio
+async def test_bad_frame_does_not_drop_connection(make_client):
+    async def handler(websocket):
+        await websocket.send(DEEPLY_NESTED)
+        await websocket.send(json.dumps({"type": "event", "payload": {"type": "update"}}))
+        await websocket.wait_closed()
+
+    async with serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        client = make_client(url=f"ws://127.0.0.1:{port}", heartbeat_interval=0)
+        received = asyncio.Event()
+        client.on("update", lambda payload: received.set())
+        await client.connect()
+        try:
+            await asyncio.wait_for(received.wait(), timeout=5)
+            assert client.is_connected
+        finally:
+            await client.disconnect()
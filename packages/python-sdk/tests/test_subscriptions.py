@@ -0,0 +1,98 @@
+import pytest
+
+from apix_client import AxonPulsClient, AxonPulsValidationError, ConnectionState
+
+
+def test_assign_slot_uses_lowest_free_slot(client):
+    assert [client._assign_slot(f"org:org1:{i}") for i in range(10)] == list(range(10))
+
+    client._release_slot("org:org1:3")
+    client._release_slot("org:org1:8")
+
+    assert client._assign_slot("org:org1:a") == 3
+    assert client._assign_slot("org:org1:b") == 8
+    assert client._assign_slot("org:org1:c") == 10
+
+
+def test_release_slot_returns_freed_slot(client):
+    client._assign_slot("org:org1:a")
+
+    assert client._release_slot("org:org1:a") == 0
+    assert client._release_slot("org:org1:a") is None
+    assert client.subscriptions == set()
+
+
+def test_assign_slot_respects_max_channels(make_client, monkeypatch):
+    monkeypatch.setattr(AxonPulsClient, "MAX_CHANNELS", 3)
+    client = make_client()
+    for i in range(3):
+        client._assign_slot(f"org:org1:{i}")
+
+    with pytest.raises(AxonPulsValidationError):
+        client._assign_slot("org:org1:overflow")
+
+    client._release_slot("org:org1:1")
+    assert client._assign_slot("org:org1:overflow") == 1
+
+
+def event(stream_entry_id, channel="org:org1:a"):
+    return {
+        "type": "event",
+        "payload": {
+            "type": "update",
+            "metadata": {"channel": channel, "stream_entry_id": stream_entry_id},
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_tracks_last_stream_id_per_subscribed_channel(client):
+    client._assign_slot("org:org1:a")
+
+    await client._handle_message(event("1700000000000-1"))
+    await client._handle_message(event("1700000000001-5"))
+    await client._handle_message(event("1700000000002-0", channel="org:org1:other"))
+
+    assert client.last_stream_ids == {"org:org1:a": "1700000000001-5"}
+
+
+@pytest.mark.asyncio
+async def test_stream_id_cleared_on_unsubscribe(client):
+    client._assign_slot("org:org1:a")
+    await client._handle_message(event("1700000000000-1"))
+
+    client.connection_state = ConnectionState.CONNECTED
+    await client.unsubscribe(["org:org1:a"])
+    client._unsubscribe_batcher.cancel()
+    assert client.subscriptions == set()
+    assert client.last_stream_ids == {}
+
+    # A new channel reusing the slot starts without a stream ID
+    client._assign_slot("org:org1:b")
+    assert client.last_stream_ids == {}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "stream_entry_id",
+    [
+        1700,
+        None,
+        "not-a-number",
+        ["1-1"],
+        "99999999999999999999999-1",
+        "5-99999999999999999999999",
+        "5--1",
+        "-5-1",
+    ],
+)
+async def test_malformed_stream_id_still_dispatches(client, stream_entry_id):
+    client._assign_slot("org:org1:a")
+    await client._handle_message(event("1700000000000-1"))
+    received = []
+    client.on("update", received.append)
+
+    await client._handle_message(event(stream_entry_id))
+
+    assert len(received) == 1
+    assert client.last_stream_ids == {"org:org1:a": "1700000000000-1"}